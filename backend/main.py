@@ -4,13 +4,17 @@ FastAPI server for ACE-Step v1.5 audio generation
 """
 
 import asyncio
-import json
+import ctypes
+import functools
 import os
 import platform
-import queue
+import subprocess
 import threading
+import time
+import traceback
 import uuid
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Optional
@@ -20,21 +24,119 @@ from typing import Callable, Optional
 if platform.system() == "Darwin":
     os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1"
 
+
+def _sysctl_int(name: str) -> Optional[int]:
+    """Read an integer sysctl on macOS; None if the key doesn't exist."""
+    try:
+        out = subprocess.run(
+            ["sysctl", "-n", name],
+            capture_output=True, text=True, check=True, timeout=2,
+        )
+        return int(out.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+
+def _linux_physical_cores() -> Optional[int]:
+    """Count distinct (package, core) pairs in /proc/cpuinfo; None if unavailable."""
+    cores = set()
+    physical_id = None
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key == "physical id":
+                    physical_id = value.strip()
+                elif key == "core id":
+                    cores.add((physical_id, value.strip()))
+    except OSError:
+        return None
+    return len(cores) or None
+
+
+def _compute_thread_count() -> int:
+    """Threads for CPU inference: one per physical performance core.
+
+    OpenMP splits work statically, so including the ~3x slower efficiency
+    cores on Apple Silicon makes every parallel region wait on E-core
+    stragglers, and SMT siblings elsewhere just contend for the same units.
+    """
+    if platform.system() == "Darwin":
+        # perflevel0 is missing on Intel Macs and older macOS.
+        count = _sysctl_int("hw.perflevel0.physicalcpu") or _sysctl_int("hw.physicalcpu")
+    elif platform.system() == "Linux":
+        count = _linux_physical_cores()
+    else:
+        count = None
+    return count or os.cpu_count() or 8
+
+
+def _env_thread_count(name: str) -> Optional[int]:
+    """Return a user thread override if it is a plain positive integer.
+
+    OpenMP also accepts forms like "8,4" (per nesting level), which are
+    left for the runtimes to interpret rather than crashing the import.
+    """
+    try:
+        value = int(os.environ.get(name, ""))
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+# OpenMP/MKL/vecLib read their pool sizes once at library load, so these must
+# also be set before importing numpy/torch. setdefault keeps user overrides.
+_CPU_THREADS = _compute_thread_count()
+os.environ.setdefault("OMP_NUM_THREADS", str(_CPU_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(_CPU_THREADS))
+os.environ.setdefault("VECLIB_MAXIMUM_THREADS", str(_CPU_THREADS))
+
 import numpy as np
 import torch
 
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    # App-managed venvs only re-run `pip install -r requirements.txt` on first
+    # setup, so installs that predate the orjson dependency fall back to stdlib.
+    import json
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _json_loads = json.loads
+
+# Generations are serialized (see _executor), so all cores go to intra-op
+# parallelism and inter-op scheduling stays on a single thread.
+torch.set_num_threads(_env_thread_count("OMP_NUM_THREADS") or _CPU_THREADS)
+torch.set_num_interop_threads(1)
+
 # Note: PYTORCH_ENABLE_MPS_FALLBACK=1 is set above to handle PyTorch MPS
-# Metal shader bugs. The handler uses offload_to_cpu=True for stability.
+# Metal shader bugs. On macOS the handler keeps PyTorch on CPU and runs the
+# DiT/VAE on the GPU through MLX instead.
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import scipy.io.wavfile as wavfile
+import soundfile as sf
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start loading the music engine in the background at server launch."""
+    # Not awaited: the server starts accepting requests while the handler loads.
+    asyncio.get_running_loop().run_in_executor(_executor, _warm_handler)
+    yield
+
 
 app = FastAPI(
     title="LoopMaker Backend",
     description="AI Music Generation API powered by ACE-Step v1.5",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS for Swift app communication
@@ -62,11 +164,26 @@ def _setup_mps_environment():
 
 _setup_mps_environment()
 
+# Probing the Metal device is not free and the answer never changes at runtime.
+_MPS_AVAILABLE = getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available()
 
-def _clear_mps_cache():
-    """Clear MPS memory cache if available."""
-    if torch.backends.mps.is_available():
-        torch.mps.empty_cache()
+
+def _clear_mps_cache(force: bool = False):
+    """Clear MPS memory cache if available.
+
+    empty_cache() stalls pending command buffers, so unless forced it only
+    runs when allocations exceed 75% of the recommended working set.
+    """
+    if not _MPS_AVAILABLE:
+        return
+    try:
+        allocated = torch.mps.current_allocated_memory()
+        limit = torch.mps.recommended_max_memory()
+        if force or allocated > 0.75 * limit:
+            torch.mps.synchronize()
+            torch.mps.empty_cache()
+    except Exception:
+        pass
 
 
 # MARK: - Model Registry
@@ -90,6 +207,14 @@ MODEL_REGISTRY = {
 # ACE-Step v1.5 handler (singleton)
 _handler = None
 _handler_initialized = False
+_handler_lock = threading.Lock()
+
+# Checkpoint config loaded by the handler (subdirectory of CHECKPOINTS_DIR).
+_ACESTEP_CONFIG_PATH = "acestep-v15-turbo"
+
+# Initialized handlers keyed by config path. delete_model(keep_warm=True) leaves
+# the entry here so a reload skips re-initialization.
+_handler_cache: dict[str, object] = {}
 
 # Writable app support directory (avoid writing into the signed .app bundle).
 APP_SUPPORT_DIR = Path.home() / "Library" / "Application Support" / "LoopMaker"
@@ -103,6 +228,10 @@ CHECKPOINTS_DIR.mkdir(parents=True, exist_ok=True)
 TRACKS_DIR = APP_SUPPORT_DIR / "tracks"
 TRACKS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Persist TorchInductor kernels across launches so torch.compile only pays the
+# full compile cost once (read lazily by inductor at first compile).
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(APP_SUPPORT_DIR / ".cache" / "torchinductor"))
+
 
 # MARK: - Request/Response Models
 
@@ -139,26 +268,109 @@ class DownloadRequest(BaseModel):
 
 # MARK: - Device Detection
 
-def get_device() -> str:
+def _detect_device() -> str:
     """Detect optimal device for inference (ACE-Step uses PyTorch for DiT, MLX for LM)."""
     if torch.cuda.is_available():
         return "cuda"
-    elif torch.backends.mps.is_available():
+    elif _MPS_AVAILABLE:
         return "mps"
     return "cpu"
 
 
+# Device availability cannot change for the life of the process; probe the
+# drivers once instead of on every /health request.
+_DEVICE = _detect_device()
+
+
+def get_device() -> str:
+    """Return the inference device detected at import time."""
+    return _DEVICE
+
+
+def _cpu_supports_bf16() -> bool:
+    """True on x86 CPUs with native bf16 matmul (AVX-512 BF16 or AMX)."""
+    cpu = getattr(torch, "cpu", None)
+    for probe in ("_is_avx512_bf16_supported", "_is_amx_tile_supported"):
+        supported = getattr(cpu, probe, None)
+        if supported is not None and supported():
+            return True
+    return False
+
+
+# bf16 autocast halves activation traffic for CPU-side PyTorch layers, but only
+# pays off with native bf16 units. Apple Silicon CPUs (M1 has no bf16 ISA) would
+# fall back to slow emulation, so macOS stays in fp32. With a GPU the DiT gains
+# nothing, and offloaded/preprocessing ops on the CPU would just lose precision.
+_CPU_BF16_AUTOCAST = _DEVICE == "cpu" and platform.system() != "Darwin" and _cpu_supports_bf16()
+
+
 # MARK: - Model Loaders
 
+# Any one of these marks a checkpoint as present. When both formats exist,
+# transformers (>=4.40, see requirements.txt) already loads model.safetensors
+# via mmap in preference to unpickling pytorch_model.bin.
+_WEIGHT_FILENAMES = frozenset({
+    "model.safetensors", "pytorch_model.bin",
+    "model.safetensors.index.json", "pytorch_model.bin.index.json",
+})
+
+
+# Checkpoint dirs already seen with weights. Downloads only ever add files while
+# the server runs, so a positive result never needs re-checking.
+_dirs_with_weights: set[Path] = set()
+
+
+def _has_weight_files(model_dir: Path) -> bool:
+    """Return True if model_dir contains any known weight file.
+
+    A single os.scandir() streams the directory and stops at the first
+    weight file instead of issuing one stat() per candidate filename;
+    positive results are memoized.
+    """
+    if model_dir in _dirs_with_weights:
+        return True
+    try:
+        with os.scandir(model_dir) as entries:
+            found = any(entry.name in _WEIGHT_FILENAMES for entry in entries)
+    except OSError:
+        # Missing, not a directory, or unreadable — treat as not downloaded.
+        return False
+    if found:
+        _dirs_with_weights.add(model_dir)
+    return found
+
+
 def _load_handler():
     """Load ACE-Step v1.5 handler with Mac-specific configuration.
 
     Uses AceStepHandler which manages DiT + LM internally.
     Downloads model weights via ensure_main_model() if missing.
+    Initialization is serialized by _handler_lock (double-checked), so
+    concurrent callers wait for one load instead of each building a handler.
     """
+    # Read the global once: delete_model() may clear it concurrently, and a
+    # published handler is always fully initialized.
+    handler = _handler
+    if handler is not None:
+        return handler
+
+    with _handler_lock:
+        if _handler is not None:
+            return _handler
+        return _init_handler()
+
+
+def _init_handler():
+    """Build and initialize the handler. Caller must hold _handler_lock."""
     global _handler, _handler_initialized
 
-    if _handler_initialized:
+    # Reuse a warm handler kept by delete_model(keep_warm=True) instead of re-running
+    # the download check and handler initialization.
+    cached = _handler_cache.get(_ACESTEP_CONFIG_PATH)
+    if cached is not None:
+        print("Reusing warm ACE-Step v1.5 handler")
+        _handler = cached
+        _handler_initialized = True
         return _handler
 
     try:
@@ -172,74 +384,122 @@ def _load_handler():
     # Clear memory before loading
     _clear_mps_cache()
 
-    # Ensure model weights are downloaded (idempotent — returns immediately if present)
-    print("Ensuring ACE-Step v1.5 model weights are available...")
-    success, message = ensure_main_model(CHECKPOINTS_DIR)
-    print(f"Model check: {message}")
-    if not success:
-        raise RuntimeError(f"Failed to download required files: {message}")
-
-    # The upstream check only verifies directories exist, not that weight files
-    # are present. Verify the actual model weights exist and force re-download
-    # if the checkpoint directory is incomplete.
-    _WEIGHT_FILENAMES = [
-        "model.safetensors", "pytorch_model.bin",
-        "model.safetensors.index.json", "pytorch_model.bin.index.json",
-    ]
-    turbo_dir = CHECKPOINTS_DIR / "acestep-v15-turbo"
-    has_weights = any((turbo_dir / f).exists() for f in _WEIGHT_FILENAMES)
-    if not has_weights:
-        print("Weight files missing in acestep-v15-turbo — forcing re-download...")
-        success, message = download_main_model(CHECKPOINTS_DIR, force=True)
-        print(f"Re-download result: {message}")
-        if not success:
-            raise RuntimeError(f"Failed to download model weights: {message}")
-        has_weights = any((turbo_dir / f).exists() for f in _WEIGHT_FILENAMES)
-        if not has_weights:
-            raise RuntimeError(
-                "Model download completed but weight files are still missing in "
-                f"{turbo_dir}. Please delete the checkpoints directory and retry."
-            )
+    # Fast path: probe the filesystem directly (memoized directory check plus a
+    # single scandir for weights) and only call into the downloader, which
+    # re-verifies every component, when something is actually missing.
+    turbo_dir = CHECKPOINTS_DIR / _ACESTEP_CONFIG_PATH
+    if _check_main_model_cached(CHECKPOINTS_DIR.stat().st_mtime_ns) and _has_weight_files(turbo_dir):
+        print("ACE-Step v1.5 model weights present")
+    else:
+        try:
+            # Ensure model weights are downloaded (idempotent — returns immediately if present)
+            print("Ensuring ACE-Step v1.5 model weights are available...")
+            success, message = ensure_main_model(CHECKPOINTS_DIR)
+            print(f"Model check: {message}")
+            if not success:
+                raise RuntimeError(f"Failed to download required files: {message}")
+
+            # The upstream check only verifies directories exist, not that weight files
+            # are present. Verify the actual model weights exist and force re-download
+            # if the checkpoint directory is incomplete.
+            has_weights = _has_weight_files(turbo_dir)
+            if not has_weights:
+                print(f"Weight files missing in {_ACESTEP_CONFIG_PATH} — forcing re-download...")
+                success, message = download_main_model(CHECKPOINTS_DIR, force=True)
+                print(f"Re-download result: {message}")
+                if not success:
+                    raise RuntimeError(f"Failed to download model weights: {message}")
+                has_weights = _has_weight_files(turbo_dir)
+                if not has_weights:
+                    raise RuntimeError(
+                        "Model download completed but weight files are still missing in "
+                        f"{turbo_dir}. Please delete the checkpoints directory and retry."
+                    )
+        finally:
+            # The downloader may have populated checkpoints without touching the
+            # top-level directory mtime; drop any stale "not downloaded" result
+            # even if handler initialization below goes on to fail.
+            _check_main_model_cached.cache_clear()
 
     # Initialize handler
     # Force CPU for PyTorch components on macOS — MPS has fatal Metal shader bugs
     # (mul_dense_scalar_float_float, masked_fill_scalar_strided_32bit, etc.)
     # that crash with validateComputeFunctionArguments assertions.
     # MLX components (DiT, VAE) still use GPU natively via use_mlx_dit=True.
-    device = "cpu" if platform.system() == "Darwin" else "auto"
+    is_darwin = platform.system() == "Darwin"
+    device = "cpu" if is_darwin else "auto"
 
     print(f"Initializing ACE-Step v1.5 handler (device={device})...")
-    _handler = AceStepHandler()
+    # Build into a local and publish to the globals only once initialization
+    # succeeds, so readers never observe a half-built (or cleared) handler.
+    handler = AceStepHandler()
 
     # ACE-Step derives its "project root" from where the package lives, which in a
     # release build is inside the signed .app bundle. Force all checkpoints/cache
     # writes into Application Support so the app isn't self-modifying.
-    _handler._get_project_root = lambda: str(APP_SUPPORT_DIR)  # type: ignore[attr-defined]
-    _handler._progress_estimates_path = os.path.join(  # type: ignore[attr-defined]
+    handler._get_project_root = lambda: str(APP_SUPPORT_DIR)  # type: ignore[attr-defined]
+    handler._progress_estimates_path = os.path.join(  # type: ignore[attr-defined]
         str(APP_SUPPORT_DIR),
         ".cache",
         "acestep",
         "progress_estimates.json",
     )
     try:
-        _handler._load_progress_estimates()  # type: ignore[attr-defined]
+        handler._load_progress_estimates()  # type: ignore[attr-defined]
     except Exception:
         pass
 
-    status, enabled = _handler.initialize_service(
+    status, enabled = handler.initialize_service(
         project_root=str(APP_SUPPORT_DIR),
-        config_path="acestep-v15-turbo",
+        config_path=_ACESTEP_CONFIG_PATH,
         device=device,
-        offload_to_cpu=True,
+        # PyTorch weights already live on the CPU on macOS, so offloading only
+        # adds device-move bookkeeping there; keep it for CUDA/auto devices.
+        offload_to_cpu=not is_darwin,
         use_mlx_dit=True,
+        # On macOS the DiT runs in MLX, so torch.compile has nothing to fuse.
+        # Elsewhere the PyTorch DiT benefits from Inductor kernel fusion.
+        compile_model=not is_darwin,
     )
     print(f"ACE-Step handler initialized: {status} (enabled={enabled})")
 
     if not enabled:
         raise RuntimeError(f"Music engine failed to initialize: {status}")
 
+    _handler = handler
     _handler_initialized = True
-    return _handler
+    _handler_cache[_ACESTEP_CONFIG_PATH] = handler
+    return handler
+
+
+# MARK: - Startup Warm-up
+
+def _warm_handler():
+    """Load the handler ahead of the first request if weights are on disk.
+
+    Never triggers a download at launch — that stays behind /models/download
+    so the app's setup flow remains in control of the ~5GB fetch. Set
+    LOOPMAKER_EAGER_LOAD=0 to opt out (e.g. on memory-constrained dev machines).
+    """
+    if os.environ.get("LOOPMAKER_EAGER_LOAD", "1") == "0":
+        print("Startup warm-up disabled via LOOPMAKER_EAGER_LOAD=0")
+        return
+    # Same condition as _init_handler's fast path: anything less would fall
+    # through to ensure_main_model() and start a download on the generation lane.
+    try:
+        downloaded = (
+            _check_main_model_cached(CHECKPOINTS_DIR.stat().st_mtime_ns)
+            and _has_weight_files(CHECKPOINTS_DIR / _ACESTEP_CONFIG_PATH)
+        )
+    except (ImportError, OSError):
+        downloaded = False
+    if not downloaded:
+        print("Startup warm-up skipped: model not fully downloaded yet")
+        return
+    try:
+        _load_handler()
+    except Exception as e:
+        print(f"Startup warm-up failed: {e}")
 
 
 # MARK: - Health Endpoint
@@ -256,6 +516,17 @@ async def health_check():
 
 # MARK: - Model Status Endpoint
 
+@functools.lru_cache(maxsize=4)
+def _check_main_model_cached(checkpoints_mtime_ns: int) -> bool:
+    """Memoized check_main_model_exists(), keyed on the checkpoints dir mtime.
+
+    The upstream check walks the checkpoint tree; keying on the directory's
+    mtime lets repeat /models/status polls cost a single stat().
+    """
+    from acestep.model_downloader import check_main_model_exists
+    return check_main_model_exists(CHECKPOINTS_DIR)
+
+
 @app.get("/models/status")
 async def get_model_status():
     """Check which models are downloaded and their capabilities"""
@@ -266,9 +537,12 @@ async def get_model_status():
         # Check if model weights exist locally
         is_downloaded = is_loaded
         if name == "acestep" and not is_downloaded:
+            # A cache miss imports acestep and walks the checkpoint tree; keep
+            # that off the event loop so WebSocket progress isn't stalled.
             try:
-                from acestep.model_downloader import check_main_model_exists
-                is_downloaded = check_main_model_exists(CHECKPOINTS_DIR)
+                is_downloaded = await asyncio.to_thread(
+                    _check_main_model_cached, CHECKPOINTS_DIR.stat().st_mtime_ns,
+                )
             except ImportError:
                 is_downloaded = False
 
@@ -285,6 +559,11 @@ async def get_model_status():
 
 # MARK: - Model Download Endpoint
 
+def _ndjson(payload: dict) -> bytes:
+    """Encode one NDJSON line. StreamingResponse sends bytes as-is, skipping str encoding."""
+    return _json_dumps(payload) + b"\n"
+
+
 @app.post("/models/download")
 async def download_model(request: DownloadRequest):
     """Download a model with progress streaming"""
@@ -294,42 +573,49 @@ async def download_model(request: DownloadRequest):
 
     async def stream_progress():
         try:
-            yield f'{{"status": "downloading", "progress": 0.1}}\n'
+            yield _ndjson({"status": "downloading", "progress": 0.1})
 
             # Download ACE-Step v1.5 — run in thread to avoid blocking event loop
-            yield f'{{"status": "downloading", "progress": 0.15, "message": "Initializing download..."}}\n'
+            yield _ndjson({"status": "downloading", "progress": 0.15, "message": "Initializing download..."})
 
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             load_future = loop.run_in_executor(
                 _executor,
                 _load_handler,
             )
 
             # Send keepalive progress updates every 5 seconds while model downloads
-            # ACE-Step downloads ~5GB (28 files) which can take 5-30 minutes
+            # ACE-Step downloads ~5GB (28 files) which can take 5-30 minutes.
+            # asyncio.wait wakes immediately when the load finishes instead of
+            # sleeping out the rest of the interval.
             tick = 0
             while not load_future.done():
-                await asyncio.sleep(5)
+                done, _ = await asyncio.wait({load_future}, timeout=5)
+                if done:
+                    break
                 tick += 1
                 # Slowly ramp progress from 0.15 to 0.75 over ~30 minutes (360 ticks)
                 progress = min(0.15 + tick * 0.005, 0.75)
                 elapsed_min = tick * 5 / 60
-                yield f'{{"status": "downloading", "progress": {progress:.3f}, "message": "Downloading required files ({elapsed_min:.1f} min elapsed)..."}}\n'
+                yield _ndjson({
+                    "status": "downloading",
+                    "progress": round(progress, 3),
+                    "message": f"Downloading required files ({elapsed_min:.1f} min elapsed)...",
+                })
 
             # Check for errors from the thread
             try:
                 load_future.result()
             except ImportError as e:
-                yield f'{{"status": "error", "error": "{str(e)}"}}\n'
+                yield _ndjson({"status": "error", "error": str(e)})
                 return
 
-            yield f'{{"status": "downloading", "progress": 0.85, "message": "Model loaded successfully"}}\n'
+            yield _ndjson({"status": "downloading", "progress": 0.85, "message": "Model loaded successfully"})
 
-            yield f'{{"status": "complete", "progress": 1.0}}\n'
+            yield _ndjson({"status": "complete", "progress": 1.0})
 
         except Exception as e:
-            error_msg = str(e).replace('"', '\\"').replace('\n', ' ')
-            yield f'{{"status": "error", "error": "{error_msg}"}}\n'
+            yield _ndjson({"status": "error", "error": str(e)})
 
     return StreamingResponse(
         stream_progress(),
@@ -357,7 +643,61 @@ async def generate_music(request: GenerationRequest):
 
 ProgressCallback = Callable[[float, str], None]
 
-_executor = ThreadPoolExecutor(max_workers=2)
+
+def _noop_progress(progress: float, message: str):
+    """Progress callback for callers that don't report progress (HTTP /generate)."""
+    pass
+
+
+# QOS_CLASS_USER_INITIATED from <sys/qos.h>.
+_QOS_CLASS_USER_INITIATED = 0x19
+
+
+def _set_worker_qos():
+    """Executor initializer: mark the generation thread as user-initiated work.
+
+    Without a QoS class macOS may park the CPU-bound worker (and the ATen
+    threads it spawns, which inherit its class) on efficiency cores.
+    """
+    if platform.system() != "Darwin":
+        return
+    try:
+        libsystem = ctypes.CDLL("/usr/lib/libSystem.dylib")
+        libsystem.pthread_set_qos_class_self_np(_QOS_CLASS_USER_INITIATED, 0)
+    except (OSError, AttributeError):
+        pass
+
+
+# One generation lane: a single ACE-Step run already saturates every core
+# through ATen's intra-op pool, so a second concurrent run only oversubscribes
+# threads and thrashes caches. Extra requests queue behind the active one.
+# Handler loads (startup warm-up, /models/download) share this lane, so the
+# model is always built and driven from the same persistent worker thread.
+_executor = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="acestep",
+    initializer=_set_worker_qos,
+)
+
+# Seconds of progress silence before ws_generate sends a keepalive heartbeat.
+_WS_HEARTBEAT_INTERVAL = 10
+_WS_HEARTBEAT_BYTES = _json_dumps({"type": "heartbeat"})
+
+# Post-processing pool: once every item is normalized, the variations' WAV
+# writes (PCM_16 encode + disk I/O) run concurrently with each other.
+_finalize_executor = ThreadPoolExecutor(max_workers=4)
+
+
+# Request-invariant generation settings, built once instead of per call.
+_QUALITY_INFER_STEPS = {"draft": 4, "fast": 8, "quality": 50}
+
+# ACE-Step uses different instruction strings to activate cover/repaint conditioning.
+# Without the cover instruction, is_covers=False and source audio latents are ignored.
+_TASK_INSTRUCTIONS = {
+    "text2music": "Fill the audio semantic mask based on the given conditions:",
+    "cover": "Generate audio semantic tokens based on the given conditions:",
+    "repaint": "Repaint the mask area based on the given conditions:",
+}
 
 
 class GenerationCancelledError(Exception):
@@ -365,6 +705,62 @@ class GenerationCancelledError(Exception):
     pass
 
 
+def _select_channels(audio_tensor: torch.Tensor) -> torch.Tensor:
+    """Return a [samples, 2] view of a generated audio tensor.
+
+    ACE-Step output is [channels, samples] stereo; 1-D or mono output is
+    broadcast to two channels (a view, no copy) so every item shares one
+    layout and batches can always be stacked.
+    """
+    audio = torch.atleast_2d(audio_tensor)  # [channels, samples]
+    if audio.shape[0] == 1:
+        audio = audio.expand(2, -1)
+    return audio[:2].transpose(0, 1)  # [samples, 2]
+
+
+# Above this many float32 samples (~128MB) in total, a batch is normalized one
+# item at a time rather than stacked (see _generate_acestep_sync).
+_BATCH_NORMALIZE_MAX_SAMPLES = 32 * 1024 * 1024
+
+
+def _normalize_to_host(items: list[torch.Tensor]) -> np.ndarray:
+    """Peak-normalize same-shaped audio tensors to 0.95 and copy them to the host.
+
+    Stacking lays every item out contiguously in one device copy; per-item
+    peaks and the scale are then computed for the whole batch at once, so
+    only the final float32 buffer crosses to the host.
+    """
+    batch = torch.stack(items).to(torch.float32)
+    # The stacked batch is contiguous, so flattening each item is a free view
+    # and aminmax gets both extremes in a single reduction pass.
+    flat = batch.view(batch.shape[0], -1)
+    min_vals, max_vals = torch.aminmax(flat, dim=1)
+    peaks = torch.maximum(max_vals, -min_vals)
+    scales = torch.where(peaks > 0, 0.95 / peaks, torch.ones_like(peaks))
+    flat.mul_(scales.unsqueeze(1))
+    return batch.cpu().numpy()
+
+
+def _write_wav(audio_float: np.ndarray, sample_rate: int, index: int, seed: int) -> GenerationResponse:
+    """Write one normalized audio buffer to the tracks directory as a 16-bit WAV."""
+    # libsndfile performs the float -> PCM_16 conversion in C with buffered
+    # I/O, so no int16 copy is built in Python.
+    final_path = TRACKS_DIR / f"{uuid.uuid4().hex}.wav"
+    print(f"Writing WAV {index+1} to {final_path}...")
+    sf.write(str(final_path), audio_float, sample_rate, subtype="PCM_16")
+    print(f"WAV {index+1} written: {os.path.getsize(final_path)} bytes")
+
+    num_samples = audio_float.shape[0]
+    duration_secs = num_samples / sample_rate
+
+    return GenerationResponse(
+        audio_path=str(final_path),
+        sample_rate=sample_rate,
+        duration=duration_secs,
+        seed=seed,
+    )
+
+
 def _generate_acestep_sync(
     request: GenerationRequest,
     progress_cb: ProgressCallback,
@@ -376,25 +772,21 @@ def _generate_acestep_sync(
     Supports text2music and cover (audio2audio) task types.
     Returns a list of GenerationResponse (one per batch item).
     """
+    # Bind the flag read once; Event.is_set() is a plain lock-free attribute
+    # read, so this stays cheap on the per-step progress path.
+    is_cancelled = cancel_event.is_set if cancel_event is not None else (lambda: False)
+
     def _throw_if_cancelled():
-        if cancel_event is not None and cancel_event.is_set():
+        if is_cancelled():
             raise GenerationCancelledError("Generation cancelled by user")
 
-    # Clear MPS cache before generation
-    _clear_mps_cache()
-
     _throw_if_cancelled()
     progress_cb(0.05, "Loading music engine...")
     handler = _load_handler()
     _throw_if_cancelled()
 
-    # Quality mode determines inference steps
-    if request.quality_mode == "draft":
-        infer_steps = 4
-    elif request.quality_mode == "quality":
-        infer_steps = 50
-    else:  # "fast" (default)
-        infer_steps = 8
+    # Quality mode determines inference steps ("fast" for unknown modes)
+    infer_steps = _QUALITY_INFER_STEPS.get(request.quality_mode, _QUALITY_INFER_STEPS["fast"])
 
     # Default to instrumental if no lyrics provided.
     # Empty string "" means "keep source vocals" (used in cover mode).
@@ -420,8 +812,9 @@ def _generate_acestep_sync(
     # Infer duration from source audio if cover mode and duration is 0
     if is_cover and duration == 0 and request.source_audio_path:
         try:
-            sr, audio = wavfile.read(request.source_audio_path)
-            duration = len(audio) / sr
+            # Header-only read: no need to decode the whole file for its length.
+            info = sf.info(request.source_audio_path)
+            duration = info.frames / info.samplerate
         except Exception:
             duration = 30.0  # fallback
 
@@ -463,21 +856,9 @@ def _generate_acestep_sync(
             progress_cb(mapped, f"{task_label} ({desc})...")
 
         print(f"Calling ACE-Step v1.5 handler.generate_music() batch_size={batch_size}...")
-        import time as _time
-        _t0 = _time.time()
+        _t0 = time.perf_counter()
 
-        # ACE-Step uses different instruction strings to activate cover/repaint conditioning.
-        # Without the cover instruction, is_covers=False and source audio latents are ignored.
-        cover_instruction = "Generate audio semantic tokens based on the given conditions:"
-        text2music_instruction = "Fill the audio semantic mask based on the given conditions:"
-        repaint_instruction = "Repaint the mask area based on the given conditions:"
-
-        if is_cover:
-            instruction = cover_instruction
-        elif is_repaint:
-            instruction = repaint_instruction
-        else:
-            instruction = text2music_instruction
+        instruction = _TASK_INSTRUCTIONS.get(request.task_type, _TASK_INSTRUCTIONS["text2music"])
 
         # Build kwargs for repaint-specific parameters
         gen_kwargs = dict(
@@ -503,10 +884,16 @@ def _generate_acestep_sync(
             if request.repainting_end is not None:
                 gen_kwargs["repainting_end"] = request.repainting_end
 
-        result = handler.generate_music(**gen_kwargs)
+        # Forward-only: inference_mode skips autograd version counters and view
+        # tracking for the PyTorch components. Post-processing below only uses
+        # out-of-place ops on the returned inference tensors.
+        with torch.inference_mode(), torch.autocast(
+            device_type="cpu", dtype=torch.bfloat16, enabled=_CPU_BF16_AUTOCAST,
+        ):
+            result = handler.generate_music(**gen_kwargs)
         _throw_if_cancelled()
 
-        print(f"Handler returned in {_time.time() - _t0:.1f}s")
+        print(f"Handler returned in {time.perf_counter() - _t0:.1f}s")
 
         # Check for errors
         if not result.get("success", False):
@@ -520,49 +907,41 @@ def _generate_acestep_sync(
         if not audios:
             raise RuntimeError("Generation produced no audio")
 
-        responses = []
+        _throw_if_cancelled()
+        views = []
+        sample_rates = []
         for i, audio_dict in enumerate(audios):
-            _throw_if_cancelled()
             audio_tensor = audio_dict["tensor"]  # [channels, samples], float32
-            sample_rate = audio_dict["sample_rate"]  # 48000
-
-            print(f"Audio {i+1}/{len(audios)}: shape={audio_tensor.shape}, sr={sample_rate}")
-
-            # Convert tensor to numpy
-            audio_np = audio_tensor.cpu().numpy()  # [channels, samples]
-
-            # Preserve stereo output from ACE-Step (shape: [channels, samples])
-            if audio_np.ndim > 1 and audio_np.shape[0] >= 2:
-                # Stereo: transpose to [samples, channels] for scipy WAV
-                audio_float = audio_np[:2].T  # [samples, 2]
-            elif audio_np.ndim > 1:
-                audio_float = audio_np[0]  # single channel
-            else:
-                audio_float = audio_np
-
-            # Normalize audio
-            max_val = np.max(np.abs(audio_float))
-            if max_val > 0:
-                audio_float = audio_float / max_val * 0.95
-
-            # Convert to int16 for WAV
-            audio_int16 = (audio_float * 32767).astype(np.int16)
-
-            # Write normalized WAV to shared tracks directory
-            final_path = TRACKS_DIR / f"{uuid.uuid4()}.wav"
-            print(f"Writing WAV {i+1} to {final_path}...")
-            wavfile.write(str(final_path), sample_rate, audio_int16)
-            print(f"WAV {i+1} written: {os.path.getsize(final_path)} bytes")
-
-            num_samples = audio_float.shape[0] if audio_float.ndim > 1 else len(audio_float)
-            duration_secs = num_samples / sample_rate
-
-            responses.append(GenerationResponse(
-                audio_path=str(final_path),
-                sample_rate=sample_rate,
-                duration=duration_secs,
-                seed=effective_seed,
-            ))
+            print(f"Audio {i+1}/{len(audios)}: shape={audio_tensor.shape}, sr={audio_dict['sample_rate']}")
+            views.append(_select_channels(audio_tensor))
+            sample_rates.append(audio_dict["sample_rate"])
+        # From here on the views are the only references we hold to the
+        # handler's output, so each original is freed once its copy is made.
+        del result, audios, audio_dict, audio_tensor
+
+        # Variations from one request almost always share a length, so small
+        # batches are normalized in a single stacked pass. Stacking copies every
+        # item while the originals are still alive, so long or wide batches go
+        # item by item instead to keep peak memory near one extra item.
+        total_samples = sum(v.numel() for v in views)
+        if total_samples <= _BATCH_NORMALIZE_MAX_SAMPLES and all(v.shape == views[0].shape for v in views):
+            audio_floats = list(_normalize_to_host(views))
+        else:
+            audio_floats = []
+            for i in range(len(views)):
+                audio_floats.append(_normalize_to_host([views[i]])[0])
+                views[i] = None
+        del views
+
+        # Write all variations concurrently; futures are kept in submission
+        # order so responses line up with the handler's batch order.
+        futures = [
+            _finalize_executor.submit(
+                _write_wav, audio_float, sample_rate, i, effective_seed,
+            )
+            for i, (audio_float, sample_rate) in enumerate(zip(audio_floats, sample_rates))
+        ]
+        responses = [f.result() for f in futures]
 
         print(f"Returning {len(responses)} response(s)")
         return responses
@@ -578,12 +957,13 @@ async def generate_acestep_http(request: GenerationRequest) -> GenerationRespons
     Returns first result only (use WebSocket for batch results).
     """
     try:
-        loop = asyncio.get_event_loop()
-        responses = await loop.run_in_executor(
+        # Share the single generation lane with ws_generate rather than the
+        # default to_thread pool, so HTTP and WebSocket requests never overlap.
+        responses = await asyncio.get_running_loop().run_in_executor(
             _executor,
             _generate_acestep_sync,
             request,
-            lambda p, m: None,
+            _noop_progress,
         )
         return responses[0]
     except ImportError:
@@ -608,104 +988,94 @@ async def ws_generate(websocket: WebSocket):
         # 1. Receive generation request from client
         raw = await websocket.receive_text()
         print(f"WebSocket: received request: {raw[:500]}")
-        data = json.loads(raw)
+        data = _json_loads(raw)
         request = GenerationRequest(**data)
         print(f"WebSocket: parsed request OK - task_type={request.task_type}, model={request.model}")
 
         # Validate model
         model_info = MODEL_REGISTRY.get(request.model)
         if not model_info:
-            await websocket.send_json({"type": "error", "detail": f"Unknown model: {request.model}"})
+            await websocket.send_bytes(_json_dumps({"type": "error", "detail": f"Unknown model: {request.model}"}))
             return
 
         if request.duration > model_info.max_duration:
-            await websocket.send_json({
+            await websocket.send_bytes(_json_dumps({
                 "type": "error",
                 "detail": f"Max duration for {request.model} is {model_info.max_duration}s, got {request.duration}s",
-            })
+            }))
             return
 
         # Validate cover mode params
         if request.task_type == "cover":
             if not request.source_audio_path:
-                await websocket.send_json({
+                await websocket.send_bytes(_json_dumps({
                     "type": "error",
                     "detail": "Cover mode requires source_audio_path",
-                })
+                }))
                 return
             if not os.path.exists(request.source_audio_path):
-                await websocket.send_json({
+                await websocket.send_bytes(_json_dumps({
                     "type": "error",
                     "detail": f"Source audio not found: {request.source_audio_path}",
-                })
+                }))
                 return
 
         # Validate repaint mode params
         if request.task_type == "repaint":
             if not request.source_audio_path:
-                await websocket.send_json({
+                await websocket.send_bytes(_json_dumps({
                     "type": "error",
                     "detail": "Repaint/extend mode requires source_audio_path",
-                })
+                }))
                 return
             if not os.path.exists(request.source_audio_path):
-                await websocket.send_json({
+                await websocket.send_bytes(_json_dumps({
                     "type": "error",
                     "detail": f"Source audio not found: {request.source_audio_path}",
-                })
+                }))
                 return
             if request.repainting_end is None:
-                await websocket.send_json({
+                await websocket.send_bytes(_json_dumps({
                     "type": "error",
                     "detail": "Repaint/extend mode requires repainting_end",
-                })
+                }))
                 return
 
-        # 2. Set up progress queue (thread-safe bridge from sync -> async)
-        progress_queue: queue.Queue = queue.Queue()
+        # 2. Set up progress queue (thread-safe bridge from sync -> async).
+        # The worker thread schedules put_nowait on the event loop, so progress
+        # is delivered as soon as it is produced instead of on a polling tick.
+        loop = asyncio.get_running_loop()
+        progress_queue: asyncio.Queue = asyncio.Queue()
 
         def progress_cb(progress: float, message: str):
-            progress_queue.put(("progress", progress, message))
+            # Coerce to builtins: the handler may report numpy scalars, which
+            # orjson (unlike stdlib json) refuses to serialize as floats.
+            loop.call_soon_threadsafe(progress_queue.put_nowait, (float(progress), str(message)))
 
-        # 3. Run generation in thread pool
-        loop = asyncio.get_event_loop()
+        # 3. Run generation in thread pool. The done-callback enqueues a None
+        # sentinel; future completion is scheduled after every put_nowait the
+        # worker issued, so the sentinel always lands behind the last progress.
         gen_future = loop.run_in_executor(_executor, _generate_acestep_sync, request, progress_cb, cancel_event)
+        gen_future.add_done_callback(lambda _: progress_queue.put_nowait(None))
 
-        # 4. Forward progress messages and send heartbeats while waiting
+        # 4. Forward progress messages as they arrive; heartbeat only when idle
         while True:
-            # Check for progress messages (non-blocking)
             try:
-                while True:
-                    msg_type, progress, message = progress_queue.get_nowait()
-                    await websocket.send_json({
-                        "type": msg_type,
-                        "progress": progress,
-                        "message": message,
-                    })
-            except queue.Empty:
-                pass
-
-            # Check if generation is done
-            if gen_future.done():
+                item = await asyncio.wait_for(progress_queue.get(), timeout=_WS_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                # Send heartbeat to keep connection alive
+                await websocket.send_bytes(_WS_HEARTBEAT_BYTES)
+                continue
+            if item is None:
                 break
-
-            # Send heartbeat to keep connection alive
-            await websocket.send_json({"type": "heartbeat"})
-            await asyncio.sleep(2)
-
-        # 5. Drain any remaining progress messages
-        try:
-            while True:
-                msg_type, progress, message = progress_queue.get_nowait()
-                await websocket.send_json({
-                    "type": msg_type,
-                    "progress": progress,
-                    "message": message,
-                })
-        except queue.Empty:
-            pass
-
-        # 6. Get result or propagate error
+            progress, message = item
+            await websocket.send_bytes(_json_dumps({
+                "type": "progress",
+                "progress": progress,
+                "message": message,
+            }))
+
+        # 5. Get result or propagate error
         print("WebSocket: getting generation result...")
         results: list[GenerationResponse] = gen_future.result()
         print(f"WebSocket: sending complete response - {len(results)} variation(s)")
@@ -722,7 +1092,7 @@ async def ws_generate(websocket: WebSocket):
         # Include the seed that was actually used (useful when random seed was generated)
         if results[0].seed is not None:
             complete_msg["seed"] = results[0].seed
-        await websocket.send_json(complete_msg)
+        await websocket.send_bytes(_json_dumps(complete_msg))
         print("WebSocket: complete message sent successfully")
 
     except GenerationCancelledError:
@@ -734,30 +1104,47 @@ async def ws_generate(websocket: WebSocket):
         if gen_future is not None and not gen_future.done():
             gen_future.cancel()
     except Exception as e:
-        import traceback
         print(f"WebSocket generation error: {e}")
         traceback.print_exc()
         cancel_event.set()
         try:
-            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.send_bytes(_json_dumps({"type": "error", "detail": str(e)}))
         except Exception:
             pass  # Connection already closed
 
 
 # MARK: - Model Deletion Endpoint
 
-@app.delete("/models/{model_name}")
-async def delete_model(model_name: str):
-    """Unload a model from memory"""
+def _unload_handler(keep_warm: bool) -> str:
+    """Drop the active handler under _handler_lock; returns the endpoint status."""
     global _handler, _handler_initialized
 
-    if model_name == "acestep" and _handler_initialized:
-        _handler = None
+    with _handler_lock:
+        was_loaded = _handler_initialized
         _handler_initialized = False
-        _clear_mps_cache()
-        return {"status": "deleted", "model": model_name}
+        _handler = None
+        if keep_warm:
+            return "cached" if was_loaded else "not_loaded"
+        if _handler_cache.pop(_ACESTEP_CONFIG_PATH, None) is not None or was_loaded:
+            _clear_mps_cache(force=True)
+            return "deleted"
+        return "not_loaded"
+
+
+@app.delete("/models/{model_name}")
+async def delete_model(model_name: str, keep_warm: bool = False):
+    """Unload a model from memory.
+
+    Pass ?keep_warm=true to keep the initialized handler (and its weights)
+    resident in _handler_cache so the next load skips initialization.
+    """
+    if model_name != "acestep":
+        return {"status": "not_loaded", "model": model_name}
 
-    return {"status": "not_loaded", "model": model_name}
+    # Taking the lock waits out any in-flight load (e.g. the startup warm-up),
+    # so it must not block the event loop.
+    status = await asyncio.to_thread(_unload_handler, keep_warm)
+    return {"status": status, "model": model_name}
 
 
 if __name__ == "__main__":